@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import select
+
+from .database import AsyncSessionLocal
+from .loaders import USER_OUT_COLUMNS
+from .models import User
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = [col.key for col in USER_OUT_COLUMNS]
+# leading characters spreadsheets treat as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_safe(value):
+    # username/name come from /register; neutralise formulas for HR spreadsheets
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunk(rows: Iterable[Sequence], header: bool = False) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_csv_safe(v) for v in row] for row in rows)
+    return buf.getvalue()
+
+
+def _ndjson_chunk(rows: Iterable[Sequence]) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n" for row in rows)
+
+
+async def _employee_batches() -> AsyncIterator[list]:
+    """
+    Yield employee rows in batches through a server-side cursor.
+    Opens its own session because the response body outlives the request's
+    get_db session.
+    """
+    stmt = (
+        select(*USER_OUT_COLUMNS)
+        .where(User.role == "employee")
+        .order_by(User.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+
+async def stream_employees(fmt: str, gzip: bool = False) -> AsyncIterator[bytes]:
+    """Encode employee rows as CSV or NDJSON, optionally gzip-compressed on the fly"""
+    compressor = zlib.compressobj(wbits=31) if gzip else None  # 31 = gzip container
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        if not compressor:
+            return data
+        # sync flush per batch so compressed bytes go out now, not at the end
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if fmt == "csv":
+        # header first so the client gets bytes before the first query round-trip
+        yield encode(_csv_chunk([], header=True))
+
+    async for rows in _employee_batches():
+        chunk = encode(_csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows))
+        if chunk:
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import HTTPException
+
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_MAX_ENTRIES = 10_000
+
+
+class _Entry:
+    def __init__(self, fingerprint: str, task: asyncio.Task):
+        self.fingerprint = fingerprint
+        self.task: Optional[asyncio.Task] = task  # dropped once finished
+        self.result: Any = None
+        self.error: Optional[tuple] = None  # (status_code, detail, headers) of a 4xx
+        self.expires_at = float("inf")  # set once the task finishes
+
+    def replay(self):
+        if self.error is not None:
+            status_code, detail, headers = self.error
+            raise HTTPException(status_code=status_code, detail=detail, headers=headers)
+        return self.result
+
+
+class IdempotencyStore:
+    """
+    Bounded in-memory store of responses keyed by Idempotency-Key.
+    - a retry with the same key replays the stored result (or 4xx error)
+    - a duplicate arriving while the first is still running awaits it
+    - unexpected errors / 5xx are not stored, so the client can retry
+    The store is per-process: a retry that lands on another worker runs again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+        ttl: float = IDEMPOTENCY_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: Dict[Hashable, _Entry] = {}
+        # finished entries in completion order; with a fixed ttl that is also expiry order
+        self._expiry: "deque[tuple]" = deque()
+
+    def _on_done(self, key: Hashable, entry: _Entry, task: asyncio.Task):
+        exc = None if task.cancelled() else task.exception()
+        replayable = exc is None or (isinstance(exc, HTTPException) and exc.status_code < 500)
+        if task.cancelled() or not replayable:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            return
+        # keep only the outcome: the task's exception traceback pins every
+        # frame's locals (request payload, session) for the whole ttl
+        if exc is None:
+            entry.result = task.result()
+        else:
+            entry.error = (exc.status_code, exc.detail, exc.headers)
+        entry.task = None
+        entry.expires_at = self.clock() + self.ttl
+        self._expiry.append((key, entry))
+        self._evict()
+
+    def _evict(self):
+        now = self.clock()
+        # expired first, then oldest finished ones over the cap; in-flight entries are never evicted
+        while self._expiry and (
+            self._expiry[0][1].expires_at <= now or len(self._entries) > self.max_entries
+        ):
+            key, entry = self._expiry.popleft()
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+    async def run(self, key: Hashable, fingerprint: str, fn: Callable[[], Awaitable[Any]]):
+        self._evict()
+        entry = self._entries.get(key)
+        if entry is not None and entry.fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key reused with a different request")
+        if entry is None:
+            entry = _Entry(fingerprint, asyncio.ensure_future(fn()))
+            self._entries[key] = entry
+            entry.task.add_done_callback(lambda t, k=key, e=entry: self._on_done(k, e, t))
+        if entry.task is None:
+            return entry.replay()
+        # shield so a disconnecting client doesn't cancel it for waiting duplicates;
+        # fn must therefore not use request-scoped resources (e.g. the get_db session)
+        return await asyncio.shield(entry.task)
+
+
+idempotency_store = IdempotencyStore()
+
+
+def _fingerprint(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+async def idempotent(key: Optional[str], scope: tuple, payload: Any, fn: Callable[[], Awaitable[Any]]):
+    """
+    Run fn once per (scope, Idempotency-Key); without a key just run it.
+    fn may outlive the request, so it has to open its own db session.
+    """
+    if not key:
+        return await fn()
+    return await idempotency_store.run((*scope, key), _fingerprint(payload), fn)
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, Sequence
+
+from sqlalchemy import select
+
+from .database import AsyncSessionLocal
+from .models import User
+
+# Columns needed to build schemas.UserOut (no password hash)
+USER_OUT_COLUMNS = (User.id, User.username, User.name, User.email, User.role)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one in-flight coroutine.
+    Callers arriving while a call is running await the same result; the
+    entry is dropped as soon as it finishes, so nothing is cached.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield so one cancelled caller doesn't cancel the query for the others
+        return await asyncio.shield(task)
+
+
+class UserLoader:
+    """
+    Batch user-profile lookups. Identical id sets requested concurrently
+    (from any connection) share a single `IN` query.
+    """
+
+    def __init__(self):
+        self._flight = SingleFlight()
+
+    async def _fetch(self, ids: Sequence[int]) -> List[dict]:
+        # own session: the shared query must not depend on one request's session
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(select(*USER_OUT_COLUMNS).where(User.id.in_(ids)))
+            return [dict(row._mapping) for row in res]
+
+    async def load_many(self, ids: Sequence[int]) -> List[dict]:
+        key = tuple(sorted(set(ids)))
+        if not key:
+            return []
+        rows = await self._flight.do(key, lambda: self._fetch(key))
+        by_id = {row["id"]: row for row in rows}
+        # keep the caller's order, skip unknown ids
+        return [by_id[i] for i in ids if i in by_id]
+
+
+user_loader = UserLoader()
@@ -1,24 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Query, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import timedelta
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from typing import List
+from typing import List, Optional
 
-from .auth import get_current_admin_user, get_password_hash, authenticate_user, create_access_token, create_refresh_token, oauth2_scheme, settings
+from .auth import get_current_admin_user, get_current_user, get_password_hash, authenticate_user, create_access_token, create_refresh_token, oauth2_scheme, settings
 from . import crud, schemas
-from .database import get_db
+from .database import get_db, AsyncSessionLocal
 from .models import User, SecurityKey
+from .loaders import user_loader
+from .exporters import stream_employees
+from .idempotency import idempotent
 
 router = APIRouter(tags=["Auth"])
 admin_router = APIRouter(tags=["Admin"])
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+MAX_BATCH_USER_IDS = 100
+MAX_USER_ID = 2**31 - 1  # users.id is int4
+
+
+async def _with_session(fn, *args):
+    # idempotent bodies can outlive the request, so they don't use get_db
+    async with AsyncSessionLocal() as db:
+        return await fn(*args, db)
+
 # ---------------- REGISTER ----------------
 @router.post("/register", response_model=schemas.UserOut)
-async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+async def register_user(
+    user: schemas.UserCreate,
+    idempotency_key: Optional[str] = Header(None),
+):
+    return await idempotent(
+        idempotency_key, ("register",), user.model_dump(exclude={"password"}),
+        lambda: _with_session(_register_user, user),
+    )
+
+async def _register_user(user: schemas.UserCreate, db: AsyncSession):
     if await crud.get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     if await crud.get_user_by_username(db, user.username):
@@ -92,14 +114,63 @@ async def me(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get
 
     return user
 
+# ---------------- BATCH USER LOOKUP ----------------
+@router.get("/users", response_model=List[schemas.UserOut])
+async def get_users(
+    ids: str = Query(..., description="Comma-separated user ids, e.g. 1,2,3"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),  # same session get_current_user used
+):
+    """Resolve many users in one query (feed author names/avatars)"""
+    try:
+        id_list = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if any(not 1 <= i <= MAX_USER_ID for i in id_list):
+        raise HTTPException(status_code=400, detail=f"ids must be between 1 and {MAX_USER_ID}")
+    if len(id_list) > MAX_BATCH_USER_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_USER_IDS} ids per request")
+
+    # hand the auth connection back to the pool; the loader checks out its own
+    await db.close()
+    return await user_loader.load_many(id_list)
+
 # ---------------- ADMIN ROUTES ----------------
 @admin_router.get("/employees", response_model=List[schemas.UserOut])
 async def list_employees(current_admin: User = Depends(get_current_admin_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.role == "employee"))
     return result.scalars().all()
 
+@admin_router.get("/employees/export")
+async def export_employees(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    current_admin: User = Depends(get_current_admin_user),
+):
+    """Stream the employee directory as CSV or NDJSON"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"employees.{format}"
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        stream_employees(format, gzip=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @admin_router.delete("/employees/{emp_id}")
-async def delete_employee(emp_id: int, current_admin: User = Depends(get_current_admin_user), db: AsyncSession = Depends(get_db)):
+async def delete_employee(
+    emp_id: int,
+    current_admin: User = Depends(get_current_admin_user),
+    idempotency_key: Optional[str] = Header(None),
+):
+    return await idempotent(
+        idempotency_key, ("delete_employee", current_admin.id), {"emp_id": emp_id},
+        lambda: _with_session(_delete_employee, emp_id),
+    )
+
+async def _delete_employee(emp_id: int, db: AsyncSession):
     result = await db.execute(select(User).where(User.id == emp_id, User.role == "employee"))
     employee = result.scalars().first()
     if not employee:
@@ -109,7 +180,18 @@ async def delete_employee(emp_id: int, current_admin: User = Depends(get_current
     return {"msg": "Employee deleted"}
 
 @admin_router.patch("/employees/{emp_id}/suspend")
-async def suspend_employee(emp_id: int, suspend: bool, current_admin: User = Depends(get_current_admin_user), db: AsyncSession = Depends(get_db)):
+async def suspend_employee(
+    emp_id: int,
+    suspend: bool,
+    current_admin: User = Depends(get_current_admin_user),
+    idempotency_key: Optional[str] = Header(None),
+):
+    return await idempotent(
+        idempotency_key, ("suspend_employee", current_admin.id), {"emp_id": emp_id, "suspend": suspend},
+        lambda: _with_session(_suspend_employee, emp_id, suspend),
+    )
+
+async def _suspend_employee(emp_id: int, suspend: bool, db: AsyncSession):
     result = await db.execute(select(User).where(User.id == emp_id, User.role == "employee"))
     employee = result.scalars().first()
     if not employee:
@@ -121,8 +203,17 @@ async def suspend_employee(emp_id: int, suspend: bool, current_admin: User = Dep
     return {"msg": f"Employee {'suspended' if suspend else 'activated'} successfully"}
 
 # ---------------- SECURITY KEY ROUTES ----------------
-@router.post("/security-keys", dependencies=[Depends(get_current_admin_user)])
-async def create_security_key(db: AsyncSession = Depends(get_db)):
+@router.post("/security-keys")
+async def create_security_key(
+    current_admin: User = Depends(get_current_admin_user),
+    idempotency_key: Optional[str] = Header(None),
+):
+    return await idempotent(
+        idempotency_key, ("create_security_key", current_admin.id), {},
+        lambda: _with_session(_create_security_key),
+    )
+
+async def _create_security_key(db: AsyncSession):
     import secrets
     key_value = secrets.token_urlsafe(16)
     new_key = SecurityKey(key=key_value)
@@ -1,21 +1,139 @@
+"""
+Synthetic data seeder for local load testing.
+
+    python -m app.seed --users 1000000 --keys 10000 --seed 42
+
+Rows are generated deterministically from --seed and --start. Every user shares one
+precomputed bcrypt hash (of --password), so generation is not CPU bound.
+On PostgreSQL (asyncpg) rows are loaded with COPY, otherwise with one
+executemany INSERT per batch; each --batch-size chunk is one transaction.
+"""
+import argparse
 import asyncio
-from app.database import AsyncSessionLocal, engine, Base
-from app.admin_models import Admin
-from app.utils import get_password_hash
+import random
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.crud import pwd_context
+from app.database import DATABASE_URL, Base
+from app.models import User, SecurityKey
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Alex", "Ananya", "Arjun", "Chen", "Daniel", "Divya", "Elena", "Fatima",
+    "Grace", "Hiro", "Isha", "James", "Karthik", "Lakshmi", "Maria", "Meera", "Mohammed", "Nikhil",
+    "Olivia", "Priya", "Rahul", "Ravi", "Sara", "Sneha", "Sofia", "Tom", "Vikram", "Yuki",
+]
+LAST_NAMES = [
+    "Agarwal", "Brown", "Chen", "Das", "Fernandes", "Garcia", "Gupta", "Iyer", "Johnson", "Khan",
+    "Kim", "Kumar", "Lee", "Martin", "Menon", "Nair", "Patel", "Reddy", "Rao", "Sato",
+    "Sharma", "Singh", "Smith", "Tamada", "Taylor", "Verma", "Wang", "Williams", "Wilson", "Zhang",
+]
+
+USER_COLUMNS = ["username", "email", "password", "role", "name"]
+KEY_COLUMNS = ["key", "is_used"]
 
-async def seed():
-    async with AsyncSessionLocal() as db:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
 
-        admin = Admin(
-            email="admin@site.com",
-            password=get_password_hash("admin123"),
-            name="Super Admin"
+def generate_users(rng: random.Random, start: int, count: int, password_hash: str, admin_ratio: float):
+    for i in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        role = "admin" if rng.random() < admin_ratio else "employee"
+        # index suffix keeps username/email unique
+        yield (
+            f"{first.lower()}.{last.lower()}{i}",
+            f"{first.lower()}.{last.lower()}{i}@bragboard.test",
+            password_hash,
+            role,
+            f"{first} {last}",
         )
-        db.add(admin)
-        await db.commit()
-        print("Admin created successfully!")
+
+
+def keys_rng(seed: int, start: int) -> random.Random:
+    # own stream keyed on --start, so appending with the same --seed gives new keys
+    return random.Random(f"{seed}:{start}:keys")
+
+
+def generate_keys(rng: random.Random, count: int):
+    for _ in range(count):
+        yield (f"{rng.getrandbits(128):032x}", rng.random() < 0.5)
+
+
+async def bulk_load(engine, table, columns, rows, batch_size: int, label: str) -> int:
+    use_copy = engine.dialect.driver == "asyncpg"
+    total = 0
+    started = time.perf_counter()
+    batch = []
+
+    async def flush():
+        async with engine.begin() as conn:
+            if use_copy:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    table.name, records=batch, columns=columns
+                )
+            else:
+                await conn.execute(insert(table), [dict(zip(columns, r)) for r in batch])
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await flush()
+            total += len(batch)
+            batch = []
+            elapsed = time.perf_counter() - started
+            print(f"{label}: {total:,} rows ({total / elapsed:,.0f} rows/s)")
+    if batch:
+        await flush()
+        total += len(batch)
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else 0
+    print(f"{label}: done, {total:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    return total
+
+
+async def seed(args):
+    engine = create_async_engine(DATABASE_URL, echo=False)  # app engine echoes every statement
+    rng = random.Random(args.seed)
+    password_hash = pwd_context.hash(args.password)  # computed once, shared by all rows
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+        res = await conn.execute(select(User.id).where(User.email == "admin@site.com"))
+        if res.first() is None:
+            await conn.execute(insert(User).values(
+                username="admin",
+                email="admin@site.com",
+                password=pwd_context.hash("admin123"),
+                role="admin",
+                name="Super Admin",
+            ))
+            print("Admin created successfully!")
+
+    if args.users:
+        users = generate_users(rng, args.start, args.users, password_hash, args.admin_ratio)
+        await bulk_load(engine, User.__table__, USER_COLUMNS, users, args.batch_size, "users")
+    if args.keys:
+        keys = generate_keys(keys_rng(args.seed, args.start), args.keys)
+        await bulk_load(engine, SecurityKey.__table__, KEY_COLUMNS, keys, args.batch_size, "security_keys")
+
+    await engine.dispose()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed BragBoard with synthetic users and security keys")
+    parser.add_argument("--users", type=int, default=0, help="number of users to generate")
+    parser.add_argument("--keys", type=int, default=0, help="number of security keys to generate")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (same seed, same rows)")
+    parser.add_argument("--start", type=int, default=1,
+                        help="first index used in usernames/emails; bump it to append to an already seeded db")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per transaction")
+    parser.add_argument("--password", default="password123", help="password shared by all generated users")
+    parser.add_argument("--admin-ratio", type=float, default=0.01, help="fraction of users with role admin")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    asyncio.run(seed())
+    asyncio.run(seed(parse_args()))
@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+import pytest
+
+# app.database / app.config read these at import time
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+
+@pytest.fixture
+def run_db():
+    """Run an async test body against fresh tables in the in-memory database"""
+    from app.database import engine
+    from app.models import Base
+
+    def run(fn):
+        async def main():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+            try:
+                return await fn()
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+async def add_users(*ids, role="employee"):
+    from app.database import AsyncSessionLocal
+    from app.models import User
+
+    async with AsyncSessionLocal() as db:
+        db.add_all(
+            User(id=i, username=f"user{i}", email=f"user{i}@bragboard.test", password="x", role=role, name=f"User {i}")
+            for i in ids
+        )
+        await db.commit()
@@ -0,0 +1,73 @@
+import csv
+import gzip
+import io
+import json
+
+from app.exporters import EXPORT_BATCH_SIZE, _csv_chunk, _ndjson_chunk, stream_employees
+
+from .conftest import add_users
+
+
+def test_csv_neutralises_formula_cells():
+    rows = [(1, "=HYPERLINK(\"x\")", "+1", "a@b.test", "employee"), (2, "@sum", "\tTab", "c@d.test", "employee")]
+    lines = _csv_chunk(rows).splitlines()
+    assert lines[0].startswith("1,\"'=HYPERLINK")
+    assert ",'+1," in lines[0]
+    assert lines[1] == "2,'@sum,'\tTab,c@d.test,employee"
+
+
+def test_csv_leaves_plain_values_alone():
+    assert _csv_chunk([(3, "alice", "Alice Smith", "a@b.test", "employee")]) == "3,alice,Alice Smith,a@b.test,employee\r\n"
+
+
+def test_ndjson_is_not_escaped():
+    assert '"username": "=cmd"' in _ndjson_chunk([(1, "=cmd", None, "a@b.test", "employee")])
+
+
+async def collect(fmt, **kwargs):
+    chunks = [chunk async for chunk in stream_employees(fmt, **kwargs)]
+    return chunks, b"".join(chunks)
+
+
+def test_csv_header_comes_first(run_db):
+    async def main():
+        await add_users(1)
+        chunks, _ = await collect("csv")
+        assert chunks[0] == b"id,username,name,email,role\r\n"
+
+    run_db(main)
+
+
+def test_ndjson_one_object_per_line(run_db):
+    async def main():
+        await add_users(1, 2)
+        await add_users(3, role="admin")
+        _, body = await collect("ndjson")
+        lines = body.decode().split("\n")
+        assert lines[-1] == ""
+        assert [json.loads(line)["id"] for line in lines[:-1]] == [1, 2]
+
+    run_db(main)
+
+
+def test_gzip_output_decompresses(run_db):
+    async def main():
+        await add_users(1, 2)
+        _, plain = await collect("csv")
+        _, packed = await collect("csv", gzip=True)
+        assert gzip.decompress(packed) == plain
+
+    run_db(main)
+
+
+def test_rows_span_batches_in_order(run_db):
+    total = EXPORT_BATCH_SIZE * 2 + 500
+
+    async def main():
+        await add_users(*range(1, total + 1))
+        chunks, body = await collect("csv")
+        assert len(chunks) >= 4  # header + one chunk per batch
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        assert [int(r[0]) for r in rows[1:]] == list(range(1, total + 1))
+
+    run_db(main)
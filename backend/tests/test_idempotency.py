@@ -0,0 +1,147 @@
+import asyncio
+import gc
+import weakref
+
+import pytest
+from fastapi import HTTPException
+
+from app.idempotency import IdempotencyStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting(result=None, exc=None, delay=0):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        if exc is not None:
+            raise exc
+        return result
+
+    return fn, calls
+
+
+def test_retry_replays_result():
+    async def main():
+        store = IdempotencyStore()
+        fn, calls = counting(result={"id": 1})
+        assert await store.run("k", "fp", fn) == {"id": 1}
+        assert await store.run("k", "fp", fn) == {"id": 1}
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+
+def test_concurrent_duplicate_waits_for_first():
+    async def main():
+        store = IdempotencyStore()
+        fn, calls = counting(result="ok", delay=0.01)
+        results = await asyncio.gather(*(store.run("k", "fp", fn) for _ in range(5)))
+        assert results == ["ok"] * 5
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+
+def test_payload_mismatch_is_422():
+    async def main():
+        store = IdempotencyStore()
+        fn, _ = counting(result="ok")
+        await store.run("k", "fp1", fn)
+        with pytest.raises(HTTPException) as err:
+            await store.run("k", "fp2", fn)
+        assert err.value.status_code == 422
+
+    asyncio.run(main())
+
+
+def test_4xx_is_replayed():
+    async def main():
+        store = IdempotencyStore()
+        fn, calls = counting(exc=HTTPException(status_code=404, detail="Employee not found"))
+        for _ in range(2):
+            with pytest.raises(HTTPException) as err:
+                await store.run("k", "fp", fn)
+            assert err.value.status_code == 404
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("exc", [HTTPException(status_code=503), RuntimeError("db down")])
+def test_5xx_and_unexpected_errors_are_not_stored(exc):
+    async def main():
+        store = IdempotencyStore()
+        fn, calls = counting(exc=exc)
+        for _ in range(2):
+            with pytest.raises(type(exc)):
+                await store.run("k", "fp", fn)
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_entries_expire_after_ttl():
+    async def main():
+        clock = FakeClock()
+        store = IdempotencyStore(ttl=10, clock=clock)
+        fn, calls = counting(result="ok")
+        await store.run("k", "fp", fn)
+        clock.now = 9
+        await store.run("k", "fp", fn)
+        assert len(calls) == 1
+        clock.now = 10
+        await store.run("k", "fp", fn)
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_size_is_bounded_oldest_first():
+    async def main():
+        store = IdempotencyStore(max_entries=2)
+        fn, calls = counting(result="ok")
+        for key in ("a", "b", "c"):
+            await store.run(key, "fp", fn)
+        assert len(store._entries) == 2
+        await store.run("c", "fp", fn)
+        assert len(calls) == 3
+        await store.run("a", "fp", fn)  # evicted, runs again
+        assert len(calls) == 4
+
+    asyncio.run(main())
+
+
+def test_replayed_4xx_does_not_hold_request_payload():
+    class Payload:
+        password = "hunter2"
+
+    async def main():
+        store = IdempotencyStore()
+        payload = Payload()
+        ref = weakref.ref(payload)
+
+        async def handler(user):
+            raise HTTPException(status_code=403, detail="Invalid or used key")
+
+        with pytest.raises(HTTPException):
+            await store.run("k", "fp", lambda: handler(payload))
+        del payload
+        await asyncio.sleep(0)  # let the loop drop its handle to the finished shield future
+        gc.collect()
+        assert ref() is None
+
+        with pytest.raises(HTTPException) as err:
+            await store.run("k", "fp", lambda: handler(None))
+        assert (err.value.status_code, err.value.detail) == (403, "Invalid or used key")
+
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import asyncio
+
+from app.loaders import SingleFlight, user_loader
+
+from .conftest import add_users
+
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [1, 2]
+
+        results = await asyncio.gather(*(flight.do((1, 2), fn) for _ in range(5)))
+        assert results == [[1, 2]] * 5
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+
+def test_nothing_is_cached_after_completion():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            return "ok"
+
+        await flight.do("k", fn)
+        await flight.do("k", fn)
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def main():
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        first = asyncio.ensure_future(flight.do("k", fn))
+        second = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "ok"
+
+    asyncio.run(main())
+
+
+def test_load_many_keeps_caller_order_and_skips_unknown(run_db):
+    async def main():
+        await add_users(1, 2, 3)
+        rows = await user_loader.load_many([3, 99, 1])
+        assert [r["id"] for r in rows] == [3, 1]
+        assert rows[0] == {"id": 3, "username": "user3", "name": "User 3", "email": "user3@bragboard.test", "role": "employee"}
+
+    run_db(main)
+
+
+def test_load_many_empty_and_duplicate_ids(run_db):
+    async def main():
+        await add_users(1, 2)
+        assert await user_loader.load_many([]) == []
+        assert [r["id"] for r in await user_loader.load_many([2, 2, 1])] == [2, 2, 1]
+
+    run_db(main)
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import AsyncSessionLocal
+from app.routers import MAX_BATCH_USER_IDS, get_users
+
+from .conftest import add_users
+
+
+@pytest.mark.parametrize("ids", [
+    "1,abc",
+    "0",
+    "-5",
+    str(2**31),
+    "99999999999",
+    ",".join(str(i) for i in range(1, MAX_BATCH_USER_IDS + 2)),
+])
+def test_get_users_rejects_bad_ids(ids):
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(get_users(ids=ids, current_user=None, db=None))
+    assert err.value.status_code == 400
+
+
+def test_get_users_dedupes_and_keeps_order(run_db):
+    async def main():
+        await add_users(1, 2, 3)
+        async with AsyncSessionLocal() as db:
+            rows = await get_users(ids="3, 1,3,42", current_user=None, db=db)
+        assert [r["id"] for r in rows] == [3, 1]
+
+    run_db(main)
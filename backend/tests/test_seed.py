@@ -0,0 +1,42 @@
+import random
+
+from sqlalchemy import func, select
+
+from app.database import engine
+from app.models import SecurityKey, User
+from app.seed import KEY_COLUMNS, USER_COLUMNS, bulk_load, generate_keys, generate_users, keys_rng
+
+
+def users(seed, start=1, count=500):
+    return list(generate_users(random.Random(seed), start, count, "hash", 0.01))
+
+
+def test_same_seed_same_rows():
+    assert users(42) == users(42)
+    assert users(42) != users(43)
+    assert list(generate_keys(keys_rng(42, 1), 100)) == list(generate_keys(keys_rng(42, 1), 100))
+
+
+def test_usernames_and_emails_unique_across_appends():
+    rows = users(42, start=1) + users(42, start=501)
+    assert len({r[0] for r in rows}) == len(rows)
+    assert len({r[1] for r in rows}) == len(rows)
+
+
+def test_appending_keys_with_same_seed_gives_new_keys():
+    first = {k for k, _ in generate_keys(keys_rng(42, 1), 100)}
+    second = {k for k, _ in generate_keys(keys_rng(42, 101), 100)}
+    assert not first & second
+
+
+def test_bulk_load_inserts_all_rows(run_db):
+    async def main():
+        n_users = await bulk_load(engine, User.__table__, USER_COLUMNS, iter(users(7, count=250)), 100, "users")
+        keys = generate_keys(keys_rng(7, 1), 30)
+        n_keys = await bulk_load(engine, SecurityKey.__table__, KEY_COLUMNS, keys, 100, "security_keys")
+        assert (n_users, n_keys) == (250, 30)
+        async with engine.connect() as conn:
+            assert await conn.scalar(select(func.count()).select_from(User)) == 250
+            assert await conn.scalar(select(func.count()).select_from(SecurityKey)) == 30
+
+    run_db(main)